@@ -11,11 +11,9 @@ This server provides:
 
 # Standard library imports
 import asyncio
-import concurrent.futures
 import datetime
 import json
 import os
-import shutil
 import threading
 from contextlib import asynccontextmanager
 from pathlib import Path
@@ -23,10 +21,13 @@ from typing import Dict, Any, List, Optional
 
 # FastAPI related imports
 from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
 # Environment and config imports
+import anyio
 import dotenv
 import nest_asyncio
 import openai
@@ -34,7 +35,6 @@ import openai
 # LangChain imports
 from langchain import hub
 from langchain.agents import AgentExecutor, create_openai_functions_agent
-from langchain.memory import ConversationBufferMemory
 from langchain_core.documents import Document
 from langchain_core.prompts import MessagesPlaceholder, ChatPromptTemplate
 from langchain_openai import ChatOpenAI
@@ -45,10 +45,15 @@ from chromadb.utils.embedding_functions import OpenAIEmbeddingFunction
 
 # File processing imports
 from markitdown import MarkItDown
-from langchain_text_splitters import RecursiveCharacterTextSplitter, Language
+from langchain_text_splitters import (
+    Language,
+    MarkdownHeaderTextSplitter,
+    RecursiveCharacterTextSplitter,
+)
 
 # Custom imports
-from tools.query_collection import query_collection_iteration
+from memory import RetrievalCompactionMemory
+from tools.query_collection import query_collection_iteration, invalidate_collection_cache
 from hyperpocket_langchain import PocketLangchain
 from composio_langchain import ComposioToolSet, App
 
@@ -65,15 +70,42 @@ nest_asyncio.apply()
 # Global agent instance
 hyperpocket_agent = None
 
+# Cached Composio tools, keyed by the API key they were built with
+composio_tools_cache = {}
+
+# Agent prompt pulled from LangChain Hub, fetched once per process
+agent_prompt = None
+
 # Data storage path
 DATA_DIR = Path("../.stateful_agent/data")
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-# Initialize embedding function
-embedding_function = OpenAIEmbeddingFunction(
-    api_key=os.environ.get('OPENAI_API_KEY'), 
-    model_name=os.environ.get('OPENAI_EMBEDDING_MODEL')
-)
+# Embedding model configuration. text-embedding-3-small at 512 dims
+# halves index memory versus the 1536-dim default with near-equal recall
+EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+EMBEDDING_DIMENSIONS = int(os.getenv("OPENAI_EMBEDDING_DIMENSIONS", "512"))
+
+# Embedding function, built lazily: chromadb 1.x raises on an empty api
+# key, and this repo's .env ships without one until /update_env sets it
+embedding_function = None
+
+def get_embedding_function():
+    """
+    Get the shared OpenAI embedding function, constructing it on first use.
+
+    Returns:
+        OpenAIEmbeddingFunction | None: The embedding function, or None
+        while no OpenAI API key is configured yet
+    """
+    global embedding_function
+    api_key = os.environ.get('OPENAI_API_KEY')
+    if embedding_function is None and api_key:
+        embedding_function = OpenAIEmbeddingFunction(
+            api_key=api_key,
+            model_name=EMBEDDING_MODEL,
+            dimensions=EMBEDDING_DIMENSIONS
+        )
+    return embedding_function
 
 # Initialize OpenAI API key
 openai.api_key = os.getenv("OPENAI_API_KEY")
@@ -113,29 +145,115 @@ class GenerateRequest(BaseModel):
 
 # ================ UTILITY FUNCTIONS ================
 
-def run_in_thread(func, *args, **kwargs):
+# Path to the server's .env file, with a parsed copy cached by mtime
+ENV_PATH = Path('.env')
+env_cache = {"mtime": None, "vars": {}}
+
+def read_env_vars() -> Dict[str, str]:
     """
-    Execute a function in a separate thread with its own event loop.
-    
-    This helps prevent event loop conflicts when running async code in threads.
-    
-    Args:
-        func: Function to execute
-        *args: Positional arguments for the function
-        **kwargs: Keyword arguments for the function
-        
+    Parse the .env file into a dict, cached by file mtime.
+
+    The file is only reopened when it changed on disk, so repeated
+    /get_env and /update_env calls don't pay file I/O each time.
+
     Returns:
-        Result from the function execution
+        Dict[str, str]: Environment variables from the .env file
+    """
+    if not ENV_PATH.exists():
+        env_cache["mtime"] = None
+        env_cache["vars"] = {}
+        return {}
+
+    mtime = ENV_PATH.stat().st_mtime
+    if env_cache["mtime"] != mtime:
+        env_vars = {}
+        with open(ENV_PATH, 'r') as file:
+            for line in file:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                if '=' in line:
+                    key, value = line.split('=', 1)
+                    env_vars[key] = value
+        env_cache["vars"] = env_vars
+        env_cache["mtime"] = mtime
+
+    return dict(env_cache["vars"])
+
+def write_env_vars(env_vars: Dict[str, str]) -> None:
+    """
+    Write environment variables to the .env file and refresh the cache.
+
+    Args:
+        env_vars: Environment variables to persist
+    """
+    with open(ENV_PATH, 'w') as file:
+        for key, value in env_vars.items():
+            file.write(f"{key}={value}\n")
+    env_cache["vars"] = dict(env_vars)
+    env_cache["mtime"] = ENV_PATH.stat().st_mtime
+
+def ensure_event_loop():
     """
-    def wrapper():
-        # Create a new event loop for this thread
+    Make sure the current thread has an event loop.
+
+    Threadpool workers are reused and start without one, but the agent's
+    nested async calls expect a loop to exist.
+    """
+    try:
+        asyncio.get_event_loop()
+    except RuntimeError:
         asyncio.set_event_loop(asyncio.new_event_loop())
-        # Run the function and return its result
-        return func(*args, **kwargs)
-    
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        future = executor.submit(wrapper)
-        return future.result()
+
+def reinit_agent():
+    """
+    Build a fresh agent from a threadpool worker.
+
+    Returns:
+        AgentExecutor: Newly initialized agent
+    """
+    ensure_event_loop()
+    return get_hyperpocket_agent()
+
+def get_composio_tools(composio_key: str) -> list:
+    """
+    Build the Composio tool list for an API key, caching the result.
+
+    Fetching integrations and tools from Composio is a series of network
+    calls, so the list is built once per key and reused on every agent
+    (re)initialization until the key changes.
+
+    Args:
+        composio_key: Composio API key to build tools with
+
+    Returns:
+        list: Tools discovered for the key's integrations
+    """
+    if composio_key in composio_tools_cache:
+        return composio_tools_cache[composio_key]
+
+    tools = []
+    try:
+        composio_toolset = ComposioToolSet(api_key=composio_key)
+        composio_integrations = composio_toolset.get_integrations()
+
+        # Collect the valid app enums and fetch all their tools in one
+        # request instead of one round trip per integration
+        app_enums = []
+        for integration in composio_integrations:
+            app_name = integration.appName.upper()
+            app_enum = getattr(App, app_name, None)
+            if app_enum and app_enum not in app_enums:
+                app_enums.append(app_enum)
+
+        if app_enums:
+            tools = composio_toolset.get_tools(apps=app_enums)
+
+        composio_tools_cache[composio_key] = tools
+    except Exception as e:
+        print(f"Error initializing Composio tools: {str(e)}")
+
+    return tools
 
 def get_hyperpocket_agent():
     """
@@ -160,25 +278,20 @@ def get_hyperpocket_agent():
     # Add Composio tools if API key is available
     composio_key = os.getenv("COMPOSIO_API_KEY")
     if composio_key:
-        try:
-            composio_toolset = ComposioToolSet(api_key=composio_key)
-            composio_integrations = composio_toolset.get_integrations()
-            
-            for integration in composio_integrations:
-                app_name = integration.appName.upper()
-                app_enum = getattr(App, app_name, None)
-                if app_enum:
-                    app_tools = composio_toolset.get_tools(apps=[app_enum])
-                    tools.extend(app_tools)
-                    
-        except Exception as e:
-            print(f"Error initializing Composio tools: {str(e)}")
+        tools.extend(get_composio_tools(composio_key))
     
-    memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
+    memory = RetrievalCompactionMemory(
+        memory_key="chat_history",
+        return_messages=True,
+        client=chroma_client,
+        embedding_function=get_embedding_function(),
+    )
     
-    # Create the agent
-    prompt = hub.pull("hwchase17/openai-functions-agent")
-    agent = create_openai_functions_agent(llm, tools, prompt)
+    # Create the agent, pulling the hub prompt only on first use
+    global agent_prompt
+    if agent_prompt is None:
+        agent_prompt = hub.pull("hwchase17/openai-functions-agent")
+    agent = create_openai_functions_agent(llm, tools, agent_prompt)
     agent_executor = AgentExecutor(agent=agent, tools=tools, memory=memory, verbose=True)
     
     print("Agent initialized successfully!")
@@ -186,41 +299,58 @@ def get_hyperpocket_agent():
 
 # ================ FILE PROCESSING ================
 
+# Shared converter; constructing MarkItDown loads its plugins, so do it once
+markitdown_converter = MarkItDown(enable_plugins=True)
+
+# Precompiled translation table for the tab-to-space cleanup
+TAB_TO_SPACE = str.maketrans("\t", " ")
+
+# Shared splitters; configuring them is pure setup cost, so pay it once
+CHUNK_SIZE = 1024
+CHUNK_OVERLAP = 64  # Overlap between chunks for context preservation
+header_splitter = MarkdownHeaderTextSplitter(
+    headers_to_split_on=[("#", "h1"), ("##", "h2"), ("###", "h3")],
+    strip_headers=False,
+)
+text_splitter = RecursiveCharacterTextSplitter.from_language(
+    language=Language.MARKDOWN,
+    chunk_size=CHUNK_SIZE,
+    chunk_overlap=CHUNK_OVERLAP,
+)
+
 async def file_to_markdown(file_path: str) -> str:
     """
     Convert a file to markdown format for processing.
-    
+
     Args:
         file_path: Path to the file to convert
-        
+
     Returns:
         str: Markdown text representation of the file
     """
-    md = MarkItDown(enable_plugins=True)
-    result = md.convert(file_path)
+    # Conversion is CPU/IO heavy, so keep it off the event loop
+    result = await run_in_threadpool(markitdown_converter.convert, file_path)
     markdown_text = result.text_content
-    markdown_text = markdown_text.replace("\t", " ")  # Replace tabs with spaces
+    markdown_text = markdown_text.translate(TAB_TO_SPACE)  # Replace tabs with spaces
     return markdown_text
 
-def markdown_chunking(markdown_text: str, chunk_size: int = 1024) -> List[str]:
+def markdown_chunking(markdown_text: str) -> List[str]:
     """
     Split markdown text into chunks for vector database storage.
-    
+
+    Sections are first split on markdown headers so chunks follow the
+    document's own structure, then oversized sections are subdivided by
+    the character splitter. Chunk sizing comes from the module-level
+    CHUNK_SIZE and CHUNK_OVERLAP.
+
     Args:
         markdown_text: The markdown text to split
-        chunk_size: Size of each chunk (default: 1024)
-        
+
     Returns:
         List[str]: List of text chunks
     """
-    chunk_overlap = 64  # Overlap between chunks for context preservation
-    text_splitter = RecursiveCharacterTextSplitter().from_language(
-        language=Language.MARKDOWN,
-        chunk_size=chunk_size, 
-        chunk_overlap=chunk_overlap,
-    )
-
-    chunked_document = text_splitter.create_documents([markdown_text])
+    sections = header_splitter.split_text(markdown_text)
+    chunked_document = text_splitter.split_documents(sections)
     chunks = [chunk.page_content for chunk in chunked_document]
     return chunks
 
@@ -248,46 +378,67 @@ async def process_file(file_path: Path) -> bool:
         markdown_text = await file_to_markdown(str(file_path))
         chunks = markdown_chunking(markdown_text)
 
-        # Recreate the collection (this is a simple approach - 
-        # in production you might want to update rather than recreate)
-        # try:
-        #     chroma_client.delete_collection("user_data")
-        #     print("Deleted existing user_data collection")
-        # except Exception:
-        #     pass  # Collection might not exist yet
-        try: 
-            collection = chroma_client.get_collection(name="user_data")
+        embedding_fn = get_embedding_function()
+        if embedding_fn is None:
+            print(f"Skipping processing for {file_path} - OpenAI API key not configured")
+            return False
+
+        try:
+            collection = chroma_client.get_or_create_collection(
+                name="user_data",
+                embedding_function=embedding_fn
+            )
         except Exception as e:
-            try:
-                collection = chroma_client.create_collection(
-                    name="user_data",
-                    embedding_function=embedding_function
-                )
-                print(f"Created fresh collection 'user_data' for processing files")
-            except Exception as e:
-                print(f"Error creating collection: {str(e)}")
-                return False
+            print(f"Error getting collection: {str(e)}")
+            return False
 
-        # Add each chunk to the collection
+        # Drop any chunks from a previous version of this file; other
+        # files' chunks stay untouched
+        try:
+            collection.delete(where={"filename": file_path.name})
+        except Exception as e:
+            print(f"Error clearing old chunks for {file_path.name}: {str(e)}")
+
+        # Build the full batch up front so embedding and insertion happen
+        # in a handful of round trips instead of one per chunk
+        # Per-file fields are identical across chunks, so build them once
+        metadata_template = {
+            "source": str(file_path),
+            "page": 0,
+            "filename": file_path.name
+        }
+        documents = []
+        metadatas = []
+        ids = []
         for i, chunk in enumerate(chunks):
-            try:
-                chunk_id = f"{file_path.stem}_{i}"
-                metadata = {
-                    "source": str(file_path),
-                    "chunk_id": i,
-                    "page": 0,
-                    "filename": file_path.name
-                }
-                embedding = embedding_function([chunk])
-                collection.add(
-                    documents=[chunk],
-                    metadatas=[metadata],
-                    ids=[chunk_id],
-                    embeddings=embedding
-                )
-                print(f"Added chunk {i} from {file_path.name}")
-            except Exception as chunk_error:
-                print(f"Error adding chunk {i} from {file_path.name}: {str(chunk_error)}")
+            documents.append(chunk)
+            metadatas.append({**metadata_template, "chunk_id": i})
+            ids.append(f"{file_path.stem}_{i}")
+
+        # Insert in sub-batches to keep individual requests bounded
+        def upsert_batches():
+            batch_size = 500
+            for start in range(0, len(documents), batch_size):
+                end = start + batch_size
+                batch_documents = documents[start:end]
+                try:
+                    embeddings = embedding_fn(batch_documents)
+                    collection.upsert(
+                        documents=batch_documents,
+                        metadatas=metadatas[start:end],
+                        ids=ids[start:end],
+                        embeddings=embeddings
+                    )
+                    print(f"Added chunks {start}-{min(end, len(documents)) - 1} from {file_path.name}")
+                except Exception as batch_error:
+                    print(f"Error adding chunks {start}-{min(end, len(documents)) - 1} from {file_path.name}: {str(batch_error)}")
+
+        # Embedding and upserting are blocking calls, so keep them off
+        # the event loop like the markdown conversion
+        await run_in_threadpool(upsert_batches)
+
+        # Make the (possibly new) collection visible to queries right away
+        invalidate_collection_cache()
 
         print(f"Successfully processed {file_path}")
         return True
@@ -298,11 +449,26 @@ async def process_file(file_path: Path) -> bool:
 
 # ================ FASTAPI APP ================
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warm process-wide caches before serving requests.
+
+    Composio tool discovery is a series of network calls, so paying it
+    once at startup keeps it off the first chat's critical path.
+    """
+    composio_key = os.getenv("COMPOSIO_API_KEY")
+    if composio_key:
+        await run_in_threadpool(get_composio_tools, composio_key)
+    yield
+
 # Create FastAPI app
 app = FastAPI(
     title="Stateful Agent API",
     description="Backend API for the Stateful Agent Chrome Extension",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware to allow cross-origin requests
@@ -331,20 +497,23 @@ async def chat(request: ChatRequest):
         def run_agent(query):
             try:
                 global hyperpocket_agent
-                
+
+                ensure_event_loop()
+
                 # Lazy initialization of agent if not already done
                 if hyperpocket_agent is None:
                     hyperpocket_agent = get_hyperpocket_agent()
-                    
+
                 # Process the query with the agent
                 result = hyperpocket_agent.invoke({"input": query})
                 return result
             except Exception as e:
                 print(f"Agent execution error: {str(e)}")
                 return {"output": f"Error processing your request: {str(e)}"}
-        
-        # Execute in a separate thread to avoid blocking the API
-        response = run_in_thread(run_agent, request.message)
+
+        # Offload to FastAPI's shared threadpool instead of spawning a
+        # fresh executor per request
+        response = await run_in_threadpool(run_agent, request.message)
         return {
             "response": response.get('output', "I'm sorry, I couldn't generate a response.")
         }
@@ -361,16 +530,20 @@ async def list_files():
         dict: List of files with metadata (name, size, modified date)
     """
     try:
-        files = []
-        for file_path in DATA_DIR.glob("*"):
-            if file_path.is_file():
-                stats = file_path.stat()
-                files.append({
-                    "name": file_path.name,
-                    "size": stats.st_size,
-                    "modified": datetime.datetime.fromtimestamp(stats.st_mtime).isoformat()
-                })
-        return {"files": files}
+        def iter_files():
+            # scandir reuses the stat info gathered during the directory
+            # scan instead of issuing a separate stat per entry
+            with os.scandir(DATA_DIR) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        stats = entry.stat()
+                        yield {
+                            "name": entry.name,
+                            "size": stats.st_size,
+                            "modified": datetime.datetime.fromtimestamp(stats.st_mtime).isoformat()
+                        }
+
+        return {"files": list(iter_files())}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -386,20 +559,40 @@ async def upload_files(files: List[UploadFile] = File(...)):
         dict: Upload status and list of uploaded files
     """
     try:
-        uploaded_files = []
-        for file in files:
-            # Save file to data directory
+        async def save_and_process(file: UploadFile) -> str:
+            # Stream file to the data directory without blocking the event loop
             file_path = DATA_DIR / file.filename
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-            
+            async with await anyio.open_file(file_path, "wb") as buffer:
+                while chunk := await file.read(1024 * 1024):
+                    await buffer.write(chunk)
+
             # Process file and add to vector database
             await process_file(file_path)
-            uploaded_files.append(file.filename)
-        
+            return file.filename
+
+        # Handle all files concurrently instead of one after another; a
+        # failure in one file shouldn't discard the others' results
+        results = await asyncio.gather(
+            *(save_and_process(file) for file in files),
+            return_exceptions=True
+        )
+
+        uploaded_files = []
+        failed_files = []
+        for file, result in zip(files, results):
+            if isinstance(result, Exception):
+                print(f"Error uploading {file.filename}: {str(result)}")
+                failed_files.append(file.filename)
+            else:
+                uploaded_files.append(result)
+
+        message = f"Successfully uploaded and processed {len(uploaded_files)} files"
+        if failed_files:
+            message += f", {len(failed_files)} failed: {', '.join(failed_files)}"
+
         return {
-            "success": True,
-            "message": f"Successfully uploaded and processed {len(uploaded_files)} files",
+            "success": not failed_files,
+            "message": message,
             "files": uploaded_files
         }
     except Exception as e:
@@ -424,11 +617,11 @@ async def delete_file(request: DeleteFileRequest):
         # Delete the physical file
         file_path.unlink()
         
-        # Remove file data from vector database
+        # Remove only this file's chunks from the vector database
         try:
             collection = chroma_client.get_collection(name="user_data")
-            # In a production system, you'd want to delete only the chunks from this file
-            # currently this is handled by recreating the collection on upload
+            collection.delete(where={"filename": request.filename})
+            invalidate_collection_cache()
         except Exception as e:
             print(f"Error removing file from ChromaDB: {str(e)}")
         
@@ -447,23 +640,12 @@ async def get_env():
         dict: Status of API keys (existence only, not values)
     """
     try:
-        dotenv_path = Path('.env')
-        env_exists = False
-        openai_exists = False
-        composio_exists = False
-        
-        if dotenv_path.exists():
-            env_exists = True
-            with open(dotenv_path, 'r') as file:
-                content = file.read()
-                openai_exists = 'OPENAI_API_KEY=' in content
-                composio_exists = 'COMPOSIO_API_KEY=' in content
-        
+        env_vars = read_env_vars()
         return {
             "success": True,
-            "env_exists": env_exists,
-            "openai_key": openai_exists,
-            "composio_key": composio_exists
+            "env_exists": ENV_PATH.exists(),
+            "openai_key": "OPENAI_API_KEY" in env_vars,
+            "composio_key": "COMPOSIO_API_KEY" in env_vars
         }
     except Exception as e:
         return {
@@ -483,22 +665,11 @@ async def update_env(request: EnvUpdateRequest):
         dict: Update status
     """
     try:
-        dotenv_path = Path('.env')
         restart_agent = False
-        
-        # Create or read existing .env file
-        env_vars = {}
-        if dotenv_path.exists():
-            # Load existing variables
-            with open(dotenv_path, 'r') as file:
-                for line in file:
-                    line = line.strip()
-                    if not line or line.startswith('#'):
-                        continue
-                    if '=' in line:
-                        key, value = line.split('=', 1)
-                        env_vars[key] = value
-        
+
+        # Load existing variables (cached unless .env changed on disk)
+        env_vars = read_env_vars()
+
         # Update values if provided
         if request.openai_key:
             if "OPENAI_API_KEY" not in env_vars or env_vars["OPENAI_API_KEY"] != request.openai_key:
@@ -511,10 +682,8 @@ async def update_env(request: EnvUpdateRequest):
             env_vars["COMPOSIO_API_KEY"] = request.composio_key
         
         # Write back to .env file
-        with open(dotenv_path, 'w') as file:
-            for key, value in env_vars.items():
-                file.write(f"{key}={value}\n")
-        
+        write_env_vars(env_vars)
+
         # Reload environment variables
         dotenv.load_dotenv(override=True)
         
@@ -523,12 +692,10 @@ async def update_env(request: EnvUpdateRequest):
             openai.api_key = request.openai_key
             os.environ["OPENAI_API_KEY"] = request.openai_key
             
-            # Update embedding function
+            # Rebuild the embedding function with the new key
             global embedding_function
-            embedding_function = OpenAIEmbeddingFunction(
-                api_key=request.openai_key, 
-                model_name=os.getenv("OPENAI_EMBEDDING_MODEL")
-            )
+            embedding_function = None
+            get_embedding_function()
         
         if request.composio_key:
             os.environ["COMPOSIO_API_KEY"] = request.composio_key
@@ -536,12 +703,9 @@ async def update_env(request: EnvUpdateRequest):
         # Reinitialize agent if needed
         if restart_agent:
             print("API keys changed - Reinitializing agent...")
-            
-            def reinit_agent():
-                return get_hyperpocket_agent()
-            
+
             global hyperpocket_agent
-            hyperpocket_agent = run_in_thread(reinit_agent)
+            hyperpocket_agent = await run_in_threadpool(reinit_agent)
             print("Agent reinitialized with new API keys!")
         
         return {"success": True}
@@ -561,12 +725,9 @@ async def reinitialize_agent():
         dict: Reinitialization status
     """
     try:
-        def reinit_agent():
-            return get_hyperpocket_agent()
-        
         global hyperpocket_agent
-        hyperpocket_agent = run_in_thread(reinit_agent)
-        
+        hyperpocket_agent = await run_in_threadpool(reinit_agent)
+
         return {"success": True, "message": "Agent reinitialized successfully"}
     except Exception as e:
         print(f"Error reinitializing agent: {str(e)}")
@@ -580,7 +741,7 @@ if __name__ == "__main__":
         
         # Initialize agent on startup
         print("Initializing agent on startup...")
-        hyperpocket_agent = run_in_thread(get_hyperpocket_agent)
+        hyperpocket_agent = get_hyperpocket_agent()
         
         # Start the server
         uvicorn.run(app, host="0.0.0.0", port=8080)
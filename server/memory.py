@@ -0,0 +1,92 @@
+"""
+Chat memory for the Stateful Agent server.
+
+Keeps the most recent conversation turns verbatim and periodically
+compacts older turns into a ChromaDB collection, from which the ones
+relevant to the current query are retrieved back into the prompt. This
+bounds prompt growth without an LLM summarization call per turn.
+"""
+
+from typing import Any, Dict, List
+
+from langchain.memory import ConversationBufferMemory
+from langchain_core.messages import SystemMessage
+
+
+class RetrievalCompactionMemory(ConversationBufferMemory):
+    """
+    Conversation memory with a bounded verbatim window and a vector archive.
+
+    Recent messages are kept in the buffer as-is. Once the buffer grows
+    past ``max_messages``, the oldest messages are moved into the
+    ``chat_memory`` Chroma collection. On each turn the archive is
+    queried with the incoming input and the closest matches are injected
+    ahead of the buffered history as a system message.
+    """
+
+    client: Any = None
+    embedding_function: Any = None
+    max_messages: int = 40
+    retrieval_k: int = 4
+    archive_collection_name: str = "chat_memory"
+
+    def _archive_collection(self):
+        """Get or create the Chroma collection backing the archive."""
+        return self.client.get_or_create_collection(
+            name=self.archive_collection_name,
+            embedding_function=self.embedding_function,
+        )
+
+    def save_context(self, inputs: Dict[str, Any], outputs: Dict[str, str]) -> None:
+        """Save this turn to the buffer, then compact if it overflowed."""
+        super().save_context(inputs, outputs)
+        self._compact()
+
+    def _compact(self) -> None:
+        """Archive messages beyond the verbatim window into ChromaDB."""
+        messages = self.chat_memory.messages
+        if self.client is None or len(messages) <= self.max_messages:
+            return
+
+        overflow = messages[:-self.max_messages]
+        try:
+            collection = self._archive_collection()
+            start = collection.count()
+            collection.upsert(
+                documents=[f"{message.type}: {message.content}" for message in overflow],
+                metadatas=[{"index": start + i} for i in range(len(overflow))],
+                ids=[f"memory_{start + i}" for i in range(len(overflow))],
+            )
+        except Exception as e:
+            print(f"Error archiving chat memory: {str(e)}")
+            return
+
+        self.chat_memory.messages = messages[-self.max_messages:]
+
+    def load_memory_variables(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Load the buffered history, prefixed with relevant archived turns."""
+        variables = super().load_memory_variables(inputs)
+        query = inputs.get("input")
+        if self.client is None or not query:
+            return variables
+
+        try:
+            collection = self._archive_collection()
+            if collection.count() == 0:
+                return variables
+            result = collection.query(
+                query_texts=[query],
+                n_results=min(self.retrieval_k, collection.count()),
+                include=["documents"],
+            )
+            recalled = result["documents"][0]
+        except Exception as e:
+            print(f"Error retrieving archived chat memory: {str(e)}")
+            return variables
+
+        if recalled:
+            context = SystemMessage(
+                content="Relevant earlier conversation:\n" + "\n".join(recalled)
+            )
+            variables[self.memory_key] = [context] + variables[self.memory_key]
+        return variables
@@ -1,6 +1,10 @@
+import heapq
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
 import chromadb
-from langchain_chroma import Chroma
 from langchain_core.documents import Document
 from langchain_community.document_loaders import PyPDFLoader
 from hyperpocket.tool import function_tool
@@ -14,7 +18,38 @@ persistent_client = chromadb.PersistentClient(
     path=os.getenv("CHROMA_PERSIST_DIRECTORY")
 )
 
-embeddings = OpenAIEmbeddings(model=os.getenv("OPENAI_EMBEDDING_MODEL"))
+embeddings = OpenAIEmbeddings(
+    model=os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small"),
+    dimensions=int(os.getenv("OPENAI_EMBEDDING_DIMENSIONS", "512")),
+)
+
+# Internal collections that hold agent state rather than user documents
+EXCLUDED_COLLECTIONS = {"chat_memory"}
+
+# Collection names, refreshed at most once per TTL instead of per query
+COLLECTION_CACHE_TTL = 5.0
+collection_names_cache = {"expires": 0.0, "names": []}
+
+def invalidate_collection_cache() -> None:
+    """Force the next query to re-list collections, e.g. after an upload."""
+    collection_names_cache["expires"] = 0.0
+
+def _get_collection_names() -> list:
+    """List searchable collection names, cached for COLLECTION_CACHE_TTL seconds."""
+    now = time.monotonic()
+    if now >= collection_names_cache["expires"]:
+        collection_names_cache["names"] = [
+            collection.name
+            for collection in persistent_client.list_collections()
+            if collection.name not in EXCLUDED_COLLECTIONS
+        ]
+        collection_names_cache["expires"] = now + COLLECTION_CACHE_TTL
+    return collection_names_cache["names"]
+
+@lru_cache(maxsize=1024)
+def _embed_query(query: str) -> tuple:
+    """Embed a query via OpenAI, cached so repeated queries skip the round trip."""
+    return tuple(embeddings.embed_query(query))
 
 @function_tool
 def query_collection_iteration(query: str):
@@ -22,25 +57,36 @@ def query_collection_iteration(query: str):
     Query the Chroma with iterating over all collections.
     Default K is 4.
     """
-    collection_list = persistent_client.list_collections()
-    collection_names = [collection.name for collection in collection_list]
-    retrieved_results = []
-    for collection_name in collection_names:
-        vector_store = Chroma(
-            collection_name=collection_name,
-            embedding_function=embeddings,
-            client=persistent_client,
+    collection_names = _get_collection_names()
+    if not collection_names:
+        return []
+
+    # Embed the query once instead of re-embedding per collection
+    query_vector = list(_embed_query(query))
+
+    def search_collection(collection_name):
+        collection = persistent_client.get_collection(collection_name)
+        return collection.query(
+            query_embeddings=[query_vector],
+            n_results=4,
+            include=["documents", "metadatas", "distances"],
         )
-        results = vector_store.similarity_search_with_score(query)
-        retrieved_results.extend(results)
-    
-    # Sort by score
-    retrieved_results.sort(key=lambda x: x[1], reverse=True)
-    
-    # Get top 4
-    retrieved_results = retrieved_results[:4]
-    
-    return retrieved_results
+
+    retrieved_results = []
+    # Searches are I/O bound, so fan them out across threads and let the
+    # wall-clock cost approach the slowest single collection
+    with ThreadPoolExecutor(max_workers=min(32, len(collection_names))) as executor:
+        for result in executor.map(search_collection, collection_names):
+            documents = result["documents"][0]
+            metadatas = result["metadatas"][0]
+            distances = result["distances"][0]
+            for document, metadata, distance in zip(documents, metadatas, distances):
+                retrieved_results.append(
+                    (Document(page_content=document, metadata=metadata or {}), distance)
+                )
+
+    # Top 4 by distance (lower is closer) without sorting the whole list
+    return heapq.nsmallest(4, retrieved_results, key=lambda x: x[1])
 
 @function_tool
 def query_collection(collection_name: str, query: str):
@@ -48,10 +94,19 @@ def query_collection(collection_name: str, query: str):
     Query the Chroma client.
     """
     collection_name = collection_name.lower()
-    vector_store = Chroma(
-        collection_name=collection_name,
-        embedding_function=embeddings,
-        persist_directory=os.getenv("CHROMA_PERSIST_DIRECTORY")
+    try:
+        collection = persistent_client.get_collection(collection_name)
+    except Exception:
+        # The name is free-form LLM tool input; an unknown collection
+        # means no matches, not an error
+        return []
+    result = collection.query(
+        query_embeddings=[list(_embed_query(query))],
+        n_results=4,
+        include=["documents", "metadatas"],
     )
-    results = vector_store.similarity_search(query)
+    results = [
+        Document(page_content=document, metadata=metadata or {})
+        for document, metadata in zip(result["documents"][0], result["metadatas"][0])
+    ]
     return results